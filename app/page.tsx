@@ -1,14 +1,17 @@
 // components/SentimentAnalysis.tsx
 'use client';
 
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer, PieChart, Pie, Cell } from 'recharts';
 import Papa from 'papaparse';
-
-interface Message {
-  text: string;
-  sentiment: string;
-}
+import {
+  Message,
+  WordCounts,
+  WordCountRequest,
+  WordCountResponse,
+  mergeVocabs,
+  mergeWordCounts
+} from './wordCount';
 
 interface WordStats {
   word: string;
@@ -25,6 +28,125 @@ interface SentimentStats {
   topWords: WordStats[];
 }
 
+// Воркер и границы его куска в data
+interface WorkerChunk {
+  worker: Worker;
+  start: number;
+  end: number;
+}
+
+// Пул воркеров и общий словарь, собранный из их словарей
+interface WorkerPool {
+  workers: WorkerChunk[];
+  vocab: string[];
+  globalIds: Uint32Array[];
+}
+
+// Результат для одного значения фильтра по слову: выборка, статистика по тональности
+// и объединенные счетчики слов. От минимальной длины слова не зависит
+interface FilterSummary {
+  wordFilter: string;
+  messages: Message[];
+  positiveCount: number;
+  negativeCount: number;
+  avgLengthPositive: number;
+  avgLengthNegative: number;
+  vocab: string[];
+  positiveCounts: Uint32Array;
+  negativeCounts: Uint32Array;
+  totalCounts: Uint32Array;
+}
+
+// Число воркеров, между которыми делится подсчет слов
+const WORKER_COUNT = Math.min(
+  typeof navigator !== 'undefined' ? navigator.hardwareConcurrency || 4 : 4,
+  8
+);
+
+// Ожидание ответа воркера, который pick распознает как свой; ошибка воркера
+// (сбой загрузки скрипта, исключение, неразбираемое сообщение) отклоняет промис
+const awaitWorkerResponse = <T,>(
+  worker: Worker,
+  pick: (response: WordCountResponse) => T | undefined,
+  send: () => void
+): Promise<T> =>
+  new Promise((resolve, reject) => {
+    const cleanup = () => {
+      worker.removeEventListener('message', onMessage);
+      worker.removeEventListener('error', onError);
+      worker.removeEventListener('messageerror', onError);
+    };
+
+    const onMessage = (event: MessageEvent<WordCountResponse>) => {
+      const result = pick(event.data);
+      if (result === undefined) return;
+      cleanup();
+      resolve(result);
+    };
+
+    const onError = (event: Event) => {
+      cleanup();
+      reject(
+        event instanceof ErrorEvent
+          ? event.error ?? new Error(event.message)
+          : new Error('Worker message could not be deserialized')
+      );
+    };
+
+    worker.addEventListener('message', onMessage);
+    worker.addEventListener('error', onError);
+    worker.addEventListener('messageerror', onError);
+    send();
+  });
+
+// Загрузка куска данных в воркер и ожидание его словаря
+const loadWorker = (
+  worker: Worker,
+  request: Extract<WordCountRequest, { type: 'load' }>
+): Promise<string[]> =>
+  awaitWorkerResponse(
+    worker,
+    response => (response.type === 'vocab' ? response.vocab : undefined),
+    () => worker.postMessage(request)
+  );
+
+// Отправка запроса воркеру и ожидание ответа с тем же requestId
+const requestWordCounts = (
+  worker: Worker,
+  request: Extract<WordCountRequest, { type: 'count' }>
+): Promise<WordCounts> =>
+  awaitWorkerResponse(
+    worker,
+    response =>
+      response.type === 'counts' && response.requestId === request.requestId ? response.counts : undefined,
+    () => worker.postMessage(request, [request.selected.buffer as ArrayBuffer])
+  );
+
+// Индексы k слов с наибольшим счетчиком без полной сортировки словаря.
+// При равенстве раньше встретившееся слово остается выше, как при стабильной сортировке.
+const selectTopIds = (
+  counts: ArrayLike<number>,
+  k: number,
+  accept: (id: number) => boolean
+): number[] => {
+  const top: number[] = [];
+
+  for (let id = 0; id < counts.length; id++) {
+    const value = counts[id];
+    if (top.length === k && value <= counts[top[k - 1]]) continue;
+    if (!accept(id)) continue;
+
+    let pos = top.length === k ? k - 1 : top.length;
+    while (pos > 0 && counts[top[pos - 1]] < value) {
+      top[pos] = top[pos - 1];
+      pos--;
+    }
+    top[pos] = id;
+  }
+
+  return top;
+};
+
 const COLORS = {
   positive: '#10b981',
   negative: '#ef4444'
@@ -35,6 +157,8 @@ export default function SentimentAnalysis() {
   const [filteredData, setFilteredData] = useState<Message[]>([]);
   const [stats, setStats] = useState<SentimentStats | null>(null);
   const [loading, setLoading] = useState(true);
+  // Сбой воркеров при подсчете слов
+  const [failed, setFailed] = useState(false);
   
   // Состояния для фильтров
   const [wordFilter, setWordFilter] = useState('');
@@ -42,57 +166,135 @@ export default function SentimentAnalysis() {
   const [appliedWordFilter, setAppliedWordFilter] = useState('');
   const [appliedMinWordLength, setAppliedMinWordLength] = useState(3);
 
+  // Пул воркеров: каждый хранит свой непрерывный кусок data
+  const poolRef = useRef<Promise<WorkerPool> | null>(null);
+  const requestIdRef = useRef(0);
+  // Последний результат: смена одной лишь минимальной длины слова его не меняет
+  const summaryCacheRef = useRef<FilterSummary | null>(null);
+
   useEffect(() => {
     loadData();
   }, []);
 
+  useEffect(() => {
+    if (data.length === 0) return;
+
+    const chunkSize = Math.ceil(data.length / WORKER_COUNT);
+    const workers: WorkerChunk[] = [];
+    const vocabs: Promise<string[]>[] = [];
+
+    try {
+      for (let start = 0; start < data.length; start += chunkSize) {
+        const end = Math.min(start + chunkSize, data.length);
+        const worker = new Worker(new URL('./wordCount.worker.ts', import.meta.url));
+        workers.push({ worker, start, end });
+        vocabs.push(loadWorker(worker, { type: 'load', messages: data.slice(start, end) }));
+      }
+
+      poolRef.current = Promise.all(vocabs).then(parts => ({ workers, ...mergeVocabs(parts) }));
+    } catch (error) {
+      // Воркер не создался: ошибку получит analyzeSentiment при ожидании пула
+      workers.forEach(({ worker }) => worker.terminate());
+      poolRef.current = Promise.reject(error);
+    }
+
+    // Ошибку пула обрабатывает analyzeSentiment; пустой catch лишь убирает
+    // предупреждение о необработанном отклонении
+    poolRef.current.catch(() => {});
+
+    return () => {
+      workers.forEach(({ worker }) => worker.terminate());
+      poolRef.current = null;
+      summaryCacheRef.current = null;
+    };
+  }, [data]);
+
   useEffect(() => {
     if (data.length > 0) {
       applyFilters();
     }
   }, [data, appliedWordFilter, appliedMinWordLength]);
 
-  const loadData = async () => {
-    try {
-      const response = await fetch('IMDBDataset.csv');
-      const csvText = await response.text();
-      
-      Papa.parse(csvText, {
-        header: true,
-        complete: (results) => {
-          const parsedData = results.data
-            .filter((row: any) => row.review && row.sentiment)
-            .map((row: any) => ({
-              text: row.review.toString().toLowerCase(),
-              sentiment: row.sentiment.toString().toLowerCase()
-            }));
-          
-          setData(parsedData);
-          setLoading(false);
-        },
-        error: (error: any) => {
-          console.error('Error parsing CSV:', error);
-          setLoading(false);
+  const loadData = () => {
+    const parsedData: Message[] = [];
+    let reviewCol = -1;
+    let sentimentCol = -1;
+    let headerSeen = false;
+
+    // Файл скачивается и разбирается по кускам: исходная строка CSV и строки Papa Parse
+    // целиком не хранятся (сами отзывы по-прежнему накапливаются в parsedData).
+    // Разбор идет в воркере Papa Parse и не блокирует страницу.
+    // Абсолютный URL нужен воркеру: относительный от его blob-адреса не разрешится
+    Papa.parse<string[]>(new URL('IMDBDataset.csv', window.location.href).href, {
+      download: true,
+      worker: true,
+      skipEmptyLines: true,
+      // Строки приходят массивами, без объекта на каждую строку
+      chunk: (results) => {
+        const rows = results.data;
+        let i = 0;
+
+        if (!headerSeen && rows.length > 0) {
+          headerSeen = true;
+          reviewCol = rows[0].indexOf('review');
+          sentimentCol = rows[0].indexOf('sentiment');
+          i = 1;
         }
-      });
-    } catch (error) {
-      console.error('Error loading data:', error);
-      setLoading(false);
-    }
+
+        for (; i < rows.length; i++) {
+          const review = rows[i][reviewCol];
+          const sentiment = rows[i][sentimentCol];
+          if (review && sentiment) {
+            parsedData.push({
+              text: review.toLowerCase(),
+              sentiment: sentiment.toLowerCase()
+            });
+          }
+        }
+      },
+      complete: () => {
+        setData(parsedData);
+        setLoading(false);
+      },
+      error: (error: any) => {
+        console.error('Error loading data:', error);
+        setLoading(false);
+      }
+    });
   };
 
   const applyFilters = () => {
-    let filtered = [...data];
+    const word = appliedWordFilter.trim() ? appliedWordFilter.toLowerCase() : '';
+
+    // Фильтр по слову не менялся (сменилась только минимальная длина слова):
+    // выборка и счетчики берутся из кэша, заново выбирается только топ
+    const cached = summaryCacheRef.current;
+    if (cached && cached.wordFilter === word) {
+      // Незавершенный подсчет для другого фильтра становится устаревшим
+      ++requestIdRef.current;
+      showSummary(cached);
+      return;
+    }
 
-    // Фильтр по слову
-    if (appliedWordFilter.trim()) {
-      filtered = filtered.filter(msg => 
-        msg.text.includes(appliedWordFilter.toLowerCase())
-      );
+    // Отметки выбранных сообщений по индексу в data, для воркеров
+    const selected = new Uint8Array(data.length);
+    let filtered = data;
+
+    // Фильтр по слову; без фильтра выбраны все сообщения и data не копируется
+    if (word) {
+      filtered = [];
+      // Обычный цикл: проход по всему датасету при каждом применении фильтра
+      for (let i = 0; i < data.length; i++) {
+        if (data[i].text.includes(word)) {
+          selected[i] = 1;
+          filtered.push(data[i]);
+        }
+      }
+    } else {
+      selected.fill(1);
     }
 
-    setFilteredData(filtered);
-    analyzeSentiment(filtered);
+    analyzeSentiment(filtered, selected, word);
   };
 
   const handleApplyFilters = () => {
@@ -100,60 +302,105 @@ export default function SentimentAnalysis() {
     setAppliedMinWordLength(minWordLength);
   };
 
-  const analyzeSentiment = (messages: Message[]) => {
-    // Подсчет количества сообщений по тональности
-    const positiveMessages = messages.filter(msg => msg.sentiment === 'positive');
-    const negativeMessages = messages.filter(msg => msg.sentiment === 'negative');
+  const analyzeSentiment = async (messages: Message[], selected: Uint8Array, wordFilter: string) => {
+    const requestId = ++requestIdRef.current;
+
+    // Подсчет количества и суммарной длины сообщений по тональности за один проход
+    let positiveCount = 0;
+    let negativeCount = 0;
+    let positiveLength = 0;
+    let negativeLength = 0;
+
+    for (let i = 0; i < messages.length; i++) {
+      const msg = messages[i];
+      if (msg.sentiment === 'positive') {
+        positiveCount++;
+        positiveLength += msg.text.length;
+      } else if (msg.sentiment === 'negative') {
+        negativeCount++;
+        negativeLength += msg.text.length;
+      }
+    }
     
     // Средняя длина сообщений
-    const avgLengthPositive = positiveMessages.length > 0 
-      ? positiveMessages.reduce((sum, msg) => sum + msg.text.length, 0) / positiveMessages.length 
-      : 0;
-    
-    const avgLengthNegative = negativeMessages.length > 0 
-      ? negativeMessages.reduce((sum, msg) => sum + msg.text.length, 0) / negativeMessages.length 
-      : 0;
+    const avgLengthPositive = positiveCount > 0 ? positiveLength / positiveCount : 0;
+    const avgLengthNegative = negativeCount > 0 ? negativeLength / negativeCount : 0;
 
-    // Анализ популярных слов
-    const wordFrequency: { [key: string]: WordStats } = {};
-    
-    messages.forEach(message => {
-      // Очистка текста и разбиение на слова
-      const words = message.text
-        .replace(/[^\w\s]/g, '')
-        .split(/\s+/)
-        .filter(word => word.length >= appliedMinWordLength);
-
-      words.forEach(word => {
-        if (!wordFrequency[word]) {
-          wordFrequency[word] = {
-            word,
-            positive: 0,
-            negative: 0,
-            total: 0
-          };
-        }
+    // Анализ популярных слов: каждый воркер считает свой кусок, результаты объединяются
+    const poolPromise = poolRef.current;
+    if (!poolPromise) return;
+    let pool: WorkerPool;
+    let parts: WordCounts[];
 
-        if (message.sentiment === 'positive') {
-          wordFrequency[word].positive++;
-        } else {
-          wordFrequency[word].negative++;
-        }
-        
-        wordFrequency[word].total++;
-      });
-    });
+    try {
+      pool = await poolPromise;
+      parts = await Promise.all(
+        pool.workers.map(({ worker, start, end }) =>
+          requestWordCounts(worker, { type: 'count', requestId, selected: selected.slice(start, end) })
+        )
+      );
+    } catch (error) {
+      console.error('Error counting words:', error);
+      if (requestId === requestIdRef.current) {
+        setFailed(true);
+      }
+      return;
+    }
 
-    // Топ 20 самых популярных слов
-    const topWords = Object.values(wordFrequency)
-      .sort((a, b) => b.total - a.total)
-      .slice(0, 20);
+    // За время подсчета фильтры могли смениться: устаревший результат не нужен
+    if (requestId !== requestIdRef.current) return;
 
-    setStats({
-      positiveCount: positiveMessages.length,
-      negativeCount: negativeMessages.length,
+    const { positiveCounts, negativeCounts } = mergeWordCounts(pool.vocab.length, parts, pool.globalIds);
+    // Общий счетчик выводится один раз по словарю, а не обновляется на каждое слово
+    const totalCounts = new Uint32Array(pool.vocab.length);
+    for (let id = 0; id < totalCounts.length; id++) {
+      totalCounts[id] = positiveCounts[id] + negativeCounts[id];
+    }
+
+    const summary: FilterSummary = {
+      wordFilter,
+      messages,
+      positiveCount,
+      negativeCount,
       avgLengthPositive,
       avgLengthNegative,
+      vocab: pool.vocab,
+      positiveCounts,
+      negativeCounts,
+      totalCounts
+    };
+    summaryCacheRef.current = summary;
+    showSummary(summary);
+  };
+
+  // Выбор топа слов с текущей минимальной длиной и вывод результата
+  const showSummary = (summary: FilterSummary) => {
+    const { vocab, positiveCounts, negativeCounts, totalCounts } = summary;
+
+    // Фильтр по длине применяется один раз к словарю, а не к каждому слову
+    // Топ 20 самых популярных слов
+    const topIds = selectTopIds(
+      totalCounts,
+      20,
+      id => totalCounts[id] > 0 && vocab[id].length >= appliedMinWordLength
+    );
+
+    // Объекты WordStats создаются только для попавших в топ слов
+    const topWords: WordStats[] = topIds.map(id => ({
+      word: vocab[id],
+      positive: positiveCounts[id],
+      negative: negativeCounts[id],
+      total: totalCounts[id]
+    }));
+
+    // Выборка и статистика обновляются вместе, чтобы карточки не показывали числа разных выборок
+    setFilteredData(summary.messages);
+    setFailed(false);
+    setStats({
+      positiveCount: summary.positiveCount,
+      negativeCount: summary.negativeCount,
+      avgLengthPositive: summary.avgLengthPositive,
+      avgLengthNegative: summary.avgLengthNegative,
       topWords
     });
   };
@@ -175,7 +422,7 @@ export default function SentimentAnalysis() {
 
   const hasActiveFilters = appliedWordFilter || appliedMinWordLength !== 3;
 
-  if (loading) {
+  if (loading || (data.length > 0 && !stats && !failed)) {
     return (
       <div className="flex justify-center items-center h-64">
         <div className="text-lg text-black">Загрузка данных...</div>
@@ -183,7 +430,7 @@ export default function SentimentAnalysis() {
     );
   }
 
-  if (!stats) {
+  if (failed || !stats) {
     return (
       <div className="flex justify-center items-center h-64">
         <div className="text-lg text-red-500">Ошибка загрузки данных</div>
@@ -0,0 +1,177 @@
+// Подсчет слов, общий для страницы и Web Worker'ов (app/wordCount.worker.ts)
+
+export interface Message {
+  text: string;
+  sentiment: string;
+}
+
+// Счетчики, выровненные по индексу слова в словаре (общий счетчик = positive + negative).
+// Typed arrays передаются из воркера без копирования (transfer).
+export interface WordCounts {
+  positiveCounts: Uint32Array;
+  negativeCounts: Uint32Array;
+}
+
+export type WordCountRequest =
+  | { type: 'load'; messages: Message[] }
+  | { type: 'count'; requestId: number; selected: Uint8Array };
+
+// Словарь воркер отправляет один раз после загрузки, дальше только счетчики
+export type WordCountResponse =
+  | { type: 'vocab'; vocab: string[] }
+  | { type: 'counts'; requestId: number; counts: WordCounts };
+
+// Коды символов для ручного лексера
+const CHAR_LT = 60; // <
+const CHAR_APOSTROPHE = 39; // '
+// Конец HTML-тега: строка для поиска через indexOf
+const TAG_CLOSE = '>';
+
+// Символ слова, как \w в регулярных выражениях: [A-Za-z0-9_]
+const isWordChar = (code: number): boolean =>
+  (code >= 97 && code <= 122) ||
+  (code >= 48 && code <= 57) ||
+  (code >= 65 && code <= 90) ||
+  code === 95;
+
+// Сообщения, один раз переведенные в индексы слов общего словаря
+export interface TokenizedMessages {
+  vocab: string[];
+  tokens: Uint32Array[];
+  positive: Uint8Array;
+}
+
+// Разбиение сообщений на слова: каждое слово хранится в словаре один раз,
+// сообщения превращаются в массивы индексов
+export const tokenizeMessages = (messages: Message[]): TokenizedMessages => {
+  const vocabIndex: { [key: string]: number } = Object.create(null);
+  const vocab: string[] = [];
+  const tokens: Uint32Array[] = [];
+  const positive = new Uint8Array(messages.length);
+  // Общий буфер индексов для всех сообщений: растет при необходимости, но не создается заново
+  let ids = new Uint32Array(1024);
+
+  // Обычные циклы вместо forEach: горячий код компилируется JIT в один цикл без колбэков
+  for (let i = 0; i < messages.length; i++) {
+    const message = messages[i];
+    positive[i] = message.sentiment === 'positive' ? 1 : 0;
+    let count = 0;
+
+    // Ручной лексер по кодам символов, эквивалент /<[^>]+>|(\w+(?:'\w+)*)/g:
+    // HTML-теги пропускаются, слова (в том числе с апострофом внутри, don't) сразу получают индекс
+    const text = message.text;
+    const length = text.length;
+    let pos = 0;
+
+    while (pos < length) {
+      const code = text.charCodeAt(pos);
+
+      if (code === CHAR_LT) {
+        const close = text.indexOf(TAG_CLOSE, pos + 1);
+        pos = close > pos + 1 ? close + 1 : pos + 1;
+        continue;
+      }
+
+      if (!isWordChar(code)) {
+        pos++;
+        continue;
+      }
+
+      const start = pos++;
+      while (pos < length) {
+        const next = text.charCodeAt(pos);
+        if (isWordChar(next)) {
+          pos++;
+        } else if (next === CHAR_APOSTROPHE && isWordChar(text.charCodeAt(pos + 1))) {
+          pos += 2;
+        } else {
+          break;
+        }
+      }
+
+      const word = text.slice(start, pos);
+      let id = vocabIndex[word];
+      if (id === undefined) {
+        id = vocab.length;
+        vocabIndex[word] = id;
+        vocab.push(word);
+      }
+
+      if (count === ids.length) {
+        const grown = new Uint32Array(ids.length * 2);
+        grown.set(ids);
+        ids = grown;
+      }
+      ids[count++] = id;
+    }
+
+    tokens.push(ids.slice(0, count));
+  }
+
+  return { vocab, tokens, positive };
+};
+
+// Подсчет слов по сообщениям, отмеченным в selected: только целочисленные индексы, без строк
+export const countWords = (tokenized: TokenizedMessages, selected: Uint8Array): WordCounts => {
+  const { vocab, tokens, positive } = tokenized;
+  const positiveCounts = new Uint32Array(vocab.length);
+  const negativeCounts = new Uint32Array(vocab.length);
+
+  for (let i = 0; i < tokens.length; i++) {
+    if (!selected[i]) continue;
+
+    const counts = positive[i] ? positiveCounts : negativeCounts;
+    const ids = tokens[i];
+    for (let j = 0; j < ids.length; j++) {
+      counts[ids[j]]++;
+    }
+  }
+
+  return { positiveCounts, negativeCounts };
+};
+
+// Общий словарь из словарей воркеров; для каждого воркера — индексы его слов в общем словаре.
+// Строится один раз после загрузки данных.
+export const mergeVocabs = (vocabs: string[][]): { vocab: string[]; globalIds: Uint32Array[] } => {
+  const vocabIndex: { [key: string]: number } = Object.create(null);
+  const vocab: string[] = [];
+
+  const globalIds = vocabs.map(partVocab => {
+    const ids = new Uint32Array(partVocab.length);
+    for (let partId = 0; partId < partVocab.length; partId++) {
+      const word = partVocab[partId];
+      let id = vocabIndex[word];
+      if (id === undefined) {
+        id = vocab.length;
+        vocabIndex[word] = id;
+        vocab.push(word);
+      }
+      ids[partId] = id;
+    }
+    return ids;
+  });
+
+  return { vocab, globalIds };
+};
+
+// Объединение частичных результатов воркеров по заранее построенным индексам
+export const mergeWordCounts = (
+  vocabSize: number,
+  parts: WordCounts[],
+  globalIds: Uint32Array[]
+): WordCounts => {
+  const positiveCounts = new Uint32Array(vocabSize);
+  const negativeCounts = new Uint32Array(vocabSize);
+
+  for (let p = 0; p < parts.length; p++) {
+    const part = parts[p];
+    const ids = globalIds[p];
+    for (let partId = 0; partId < ids.length; partId++) {
+      const id = ids[partId];
+      positiveCounts[id] += part.positiveCounts[partId];
+      negativeCounts[id] += part.negativeCounts[partId];
+    }
+  }
+
+  return { positiveCounts, negativeCounts };
+};
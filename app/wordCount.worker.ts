@@ -0,0 +1,22 @@
+// Web Worker: хранит свою часть датасета в виде индексов слов и считает по ней слова
+import { countWords, tokenizeMessages, TokenizedMessages, WordCountRequest, WordCountResponse } from './wordCount';
+
+let tokenized: TokenizedMessages = tokenizeMessages([]);
+
+self.addEventListener('message', (event: MessageEvent<WordCountRequest>) => {
+  const request = event.data;
+
+  if (request.type === 'load') {
+    // Разбиение на слова выполняется один раз; при смене фильтров считаются только индексы
+    tokenized = tokenizeMessages(request.messages);
+    const response: WordCountResponse = { type: 'vocab', vocab: tokenized.vocab };
+    self.postMessage(response);
+    return;
+  }
+
+  const counts = countWords(tokenized, request.selected);
+  const response: WordCountResponse = { type: 'counts', requestId: request.requestId, counts };
+  self.postMessage(response, {
+    transfer: [counts.positiveCounts.buffer as ArrayBuffer, counts.negativeCounts.buffer as ArrayBuffer]
+  });
+});